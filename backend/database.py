@@ -1,44 +1,147 @@
 # backend/database.py
 
-import glob
+import hashlib
 import logging
 import os
 import re
+import stat
 import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime
 from datetime import timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from .models import Article
 
 logger = logging.getLogger(__name__)
 
-# 数据库全局状态（需加锁保护）
-_lock = threading.Lock()
-_db: List[Article] = []
-_next_id: int = 1
-
 CACHE_EXPIRY = timedelta(minutes=30)
+CACHE_MAX_CHARS = 32 * 1024 * 1024  # 缓存内容总字符数上限
 ARCHIVE_DIR = "archive"
+SCAN_PARALLEL_THRESHOLD = 256  # 启动扫描时超过该文件数才使用线程池并发 stat
+SCAN_MAX_WORKERS = 32
+
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\s-]')
+
+
+class _Database:
+    """内存中的文章库状态，所有读写都需持有 _lock"""
+
+    __slots__ = (
+        "by_id", "next_id", "version", "snapshot", "categories_snapshot",
+        "file_paths", "content_cache", "cache_size",
+    )
+
+    def __init__(self):
+        self.by_id: Dict[int, Article] = {}  # id -> Article，dict 保持插入顺序
+        self.next_id: int = 1
+        self.version: int = 0  # 数据版本号，文章增删改时递增，供上层缓存判断是否失效
+        self.snapshot: Optional[Tuple[Article, ...]] = None  # get_articles 结果缓存，增删文章时失效
+        self.categories_snapshot: Optional[OrderedDict] = None  # get_categories 结果缓存，增删文章时失效
+        self.file_paths: Set[str] = set()  # archive 中已存在的 .md 文件路径，用于 O(1) 判断文件名冲突
+        # 文章内容缓存索引：id -> (内容长度, 最近访问时间 monotonic)，按访问顺序排列（最久未访问在前）
+        # 内容本身保存在 Article.content 中，淘汰时清空；文件 mtime 与 Article.file_mtime 不一致时重新读取
+        self.content_cache: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self.cache_size: int = 0
+
+    def invalidate_snapshots(self) -> None:
+        """文章增删后使列表与分类缓存失效"""
+        self.version += 1
+        self.snapshot = None
+        self.categories_snapshot = None
+
+    def cache_put(self, article: Article) -> None:
+        """记录文章内容已缓存（或被访问），超出容量时淘汰最久未访问的内容"""
+        cache = self.content_cache
+        entry = cache.pop(article.id, None)
+        if entry is not None:
+            self.cache_size -= entry[0]
+        size = len(article.content)
+        cache[article.id] = (size, time.monotonic())
+        self.cache_size += size
+        while self.cache_size > CACHE_MAX_CHARS and len(cache) > 1:
+            self.cache_drop(next(iter(cache)))
+
+    def cache_drop(self, article_id: int) -> None:
+        """从缓存中移除文章内容"""
+        entry = self.content_cache.pop(article_id, None)
+        if entry is None:
+            return
+        self.cache_size -= entry[0]
+        article = self.by_id.get(article_id)
+        if article is not None and article.file_path:
+            article.content = ""
+
+
+# 数据库全局状态（需加锁保护）
+_lock = threading.Lock()
+_state = _Database()
+# 串行化写操作（创建/更新/删除）；文件写入与 fsync 只持有该锁，不阻塞持有 _lock 的读请求
+_write_lock = threading.Lock()
 
 
 def _safe_filename(title: str) -> str:
     """将标题转换为安全文件名（仅保留字母数字、空格、连字符、下划线）"""
-    return re.sub(r'[^\w\s-]', '_', title).strip()
+    return _UNSAFE_FILENAME_RE.sub('_', title).strip()
 
 
-def _load_content(file_path: str) -> str:
-    """读取文件内容，异常时返回错误提示"""
+def _load_content(file_path: str) -> Tuple[str, bool]:
+    """读取文件内容，返回 (内容, 是否成功)；异常时内容为错误提示"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+            return f.read(), True
     except FileNotFoundError:
-        logger.warning(f"Article file missing: {file_path}")
-        return "⚠️ 文章文件丢失，请联系管理员"
+        logger.warning("Article file missing: %s", file_path)
+        return "⚠️ 文章文件丢失，请联系管理员", False
     except OSError as e:
-        logger.error(f"Error loading content for {file_path}: {e}")
-        return "⚠️ 文章加载失败，请稍后再试"
+        logger.error("Error loading content for %s: %s", file_path, e)
+        return "⚠️ 文章加载失败，请稍后再试", False
+
+
+def _write_file_atomic(file_path: str, content: str) -> int:
+    """
+    先写入临时文件并 fsync，再用 os.replace 原子替换目标文件，
+    写入中途崩溃不会留下残缺的文章。返回写入后文件的修改时间（纳秒）。
+    符号链接会先解析为真实路径（替换目标文件而非链接本身），并保留原文件的权限位。
+    """
+    target_path = os.path.realpath(file_path)
+    tmp_path = target_path + ".tmp"
+    try:
+        mode = stat.S_IMODE(os.stat(target_path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, target_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return mtime
+
+
+def _content_hash(content: str) -> bytes:
+    """计算文章内容摘要，用于判断内容是否变化"""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+def _file_mtime(file_path: str) -> Optional[int]:
+    """返回文件的修改时间（纳秒），文件不可访问时返回 None"""
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
 
 
 def _extract_category(file_path: str) -> str:
@@ -55,85 +158,173 @@ def _extract_category(file_path: str) -> str:
     return ""
 
 
+def _stat_entry(entry: os.DirEntry) -> Optional[os.stat_result]:
+    """获取目录项的 stat 结果，失败时返回 None"""
+    try:
+        return entry.stat()
+    except OSError as e:
+        logger.warning("Skipping unreadable entry %s: %s", entry.path, e)
+        return None
+
+
+def _scan_markdown_files(root: str) -> List[Tuple[str, os.stat_result]]:
+    """
+    递归扫描目录下的 .md 文件，返回 (路径, stat 结果) 列表（按路径排序）。
+    使用 os.scandir 遍历目录，文件较多时用线程池并发 stat（os.stat 会释放 GIL），
+    在 NFS 等高延迟存储上可显著缩短启动时间；与 glob 一致，跳过以 "." 开头的隐藏文件和目录。
+    """
+    entries = []
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            pending.append(entry.path)
+                        elif entry.is_file() and entry.name.endswith(".md"):
+                            entries.append(entry)
+                    except OSError as e:
+                        logger.warning("Skipping unreadable entry %s: %s", entry.path, e)
+        except OSError as e:
+            logger.warning("Failed to scan directory %s: %s", current, e)
+
+    if len(entries) > SCAN_PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+            stats = list(executor.map(_stat_entry, entries))
+    else:
+        stats = [_stat_entry(entry) for entry in entries]
+
+    results = [(entry.path, st) for entry, st in zip(entries, stats) if st is not None]
+    results.sort(key=lambda item: item[0])
+    return results
+
+
 def init_archive() -> None:
     """启动时扫描archive目录并初始化文章（支持子目录分类）"""
-    global _db, _next_id
-
     if not os.path.exists(ARCHIVE_DIR):
         os.makedirs(ARCHIVE_DIR)
-        logger.info(f"Created archive directory: {ARCHIVE_DIR}")
+        logger.info("Created archive directory: %s", ARCHIVE_DIR)
         return
 
     # 递归扫描所有 .md 文件（包括子目录）
-    md_files = sorted(glob.glob(os.path.join(ARCHIVE_DIR, "**", "*.md"), recursive=True))
-    logger.info(f"Found {len(md_files)} markdown files in archive")
+    started = time.perf_counter()
+    md_files = _scan_markdown_files(ARCHIVE_DIR)
+    debug = logger.isEnabledFor(logging.DEBUG)
 
+    state = _state
     with _lock:
-        for file_path in md_files:
+        next_id = max(state.by_id, default=0) + 1
+        for file_path, st in md_files:
             filename = os.path.basename(file_path)
-            title = os.path.splitext(filename)[0]
+            title = filename[:-3]
             category = _extract_category(file_path)
-
-            try:
-                created_at = datetime.fromtimestamp(os.path.getctime(file_path))
-                updated_at = datetime.fromtimestamp(os.path.getmtime(file_path))
-            except OSError:
-                created_at = updated_at = datetime.now()
+            created_at = datetime.fromtimestamp(st.st_ctime)
+            updated_at = datetime.fromtimestamp(st.st_mtime)
 
             article = Article(
-                id=_next_id,
+                id=next_id,
                 title=title,
                 content="",
                 created_at=created_at,
                 updated_at=updated_at,
                 file_path=file_path,
-                last_accessed=datetime.now(),
                 category=category
             )
-            _db.append(article)
-            logger.info(f"Added archived article: {title} (ID: {_next_id}, Category: '{category or '无'}')")
-            _next_id += 1
+            state.by_id[next_id] = article
+            state.file_paths.add(file_path)
+            if debug:
+                logger.debug("Added archived article: %s (ID: %d, Category: '%s')", title, next_id, category or '无')
+            next_id += 1
+        state.next_id = next_id
+        state.invalidate_snapshots()
+        logger.info("Initialized %d articles from archive in %.2fs", len(state.by_id), time.perf_counter() - started)
+
 
+def get_db_version() -> int:
+    """返回当前数据版本号（任何文章增删改后都会变化）"""
+    return _state.version
 
-def get_articles() -> List[Article]:
-    """返回所有文章列表（浅拷贝，避免外部直接修改）"""
+
+def get_articles() -> Tuple[Article, ...]:
+    """返回所有文章列表（不可变元组，在增删文章之间复用）"""
+    state = _state
     with _lock:
-        return list(_db)
+        if state.snapshot is None:
+            state.snapshot = tuple(state.by_id.values())
+        return state.snapshot
 
 
 def get_categories() -> OrderedDict:
     """
     返回按分类分组的文章字典。
     键为分类名称（空字符串表示无分类），值为该分类下的文章列表。
-    保持首次出现的顺序。
+    保持首次出现的顺序。结果在增删文章之间复用，调用方不应修改。
     """
+    state = _state
     with _lock:
-        categories = OrderedDict()
-        for article in _db:
-            cat = article.category
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append(article)
-        return categories
+        if state.categories_snapshot is None:
+            categories = OrderedDict()
+            for article in state.by_id.values():
+                cat = article.category
+                if cat not in categories:
+                    categories[cat] = []
+                categories[cat].append(article)
+            state.categories_snapshot = categories
+        return state.categories_snapshot
 
 
 def get_article(article_id: int) -> Optional[Article]:
-    """获取单篇文章（按需加载内容）"""
+    """
+    获取单篇文章（按需加载内容，已缓存的内容以文件 mtime 校验）。
+    返回在锁内复制的快照：缓存淘汰会清空共享对象的 content，调用方渲染时不能依赖共享对象。
+    """
+    state = _state
+    with _lock:
+        article = state.by_id.get(article_id)
+        if article is None:
+            return None
+        if not article.file_path:
+            return replace(article)
+        file_path = article.file_path
+        cached_mtime = article.file_mtime if article.content else None
+        # 记录本篇文章的状态，读取完成后据此判断期间是否被更新（不受其他文章增删改影响）
+        stamp = (article.updated_at, article.file_mtime)
+
+    # 在锁外 stat / 读取文件，避免慢速磁盘 I/O 阻塞其他请求线程
+    mtime = _file_mtime(file_path)
+    if mtime is not None and mtime == cached_mtime:
+        with _lock:
+            if article.content and state.by_id.get(article_id) is article:
+                state.cache_put(article)
+                return replace(article)
+
+    content, ok = _load_content(file_path)
+    content_hash = _content_hash(content) if ok else None
     with _lock:
-        for article in _db:
-            if article.id == article_id:
-                # 按需加载内容
-                if article.file_path and not article.content:
-                    article.content = _load_content(article.file_path)
-                article.last_accessed = datetime.now()
-                return article
-    return None
+        # 读取期间本篇文章可能已被更新，此时保留更新后的内容
+        if (article.updated_at, article.file_mtime) == stamp or not article.content:
+            article.content = content
+            article.content_hash = content_hash
+            article.file_mtime = mtime if ok else None
+            if state.by_id.get(article_id) is article:
+                state.cache_put(article)
+        # 缓存写入不会淘汰刚放入的条目，此时 content 必然是本次读取或并发更新后的内容
+        return replace(article)
+
+
+def get_article_meta(article_id: int) -> Optional[Article]:
+    """获取单篇文章的元数据（不加载内容、不影响内容缓存）"""
+    with _lock:
+        return _state.by_id.get(article_id)
 
 
 def create_new_article(title: str, content: str, category: str = "") -> Article:
-    """创建新文章并持久化到文件"""
-    global _next_id
-
+    """创建新文章并持久化到文件（返回快照，见 get_article）"""
+    state = _state
     safe_title = _safe_filename(title)
     now = datetime.now()
 
@@ -144,89 +335,151 @@ def create_new_article(title: str, content: str, category: str = "") -> Article:
     else:
         target_dir = ARCHIVE_DIR
 
-    # 生成不冲突的文件名
+    # 生成不冲突的文件名：先查内存中的路径集合，再以 O_EXCL 独占创建，避免检查与创建之间的竞争
     file_path = os.path.join(target_dir, f"{safe_title}.md")
     counter = 1
-    with _lock:
-        while os.path.exists(file_path):
-            filename = f"{safe_title}_{counter}.md"
-            file_path = os.path.join(target_dir, filename)
-            counter += 1
-
-        # 写入文件
+    with _write_lock:
+        with _lock:
+            while True:
+                if file_path not in state.file_paths:
+                    try:
+                        # 独占创建占位文件，随后原子写入内容
+                        os.close(os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                        break
+                    except FileExistsError:
+                        # 文件由外部创建，记录后继续尝试下一个名称
+                        state.file_paths.add(file_path)
+                    except OSError as e:
+                        logger.error("Failed to create article file: %s", e)
+                        raise IOError("无法保存文章文件") from e
+                filename = f"{safe_title}_{counter}.md"
+                file_path = os.path.join(target_dir, filename)
+                counter += 1
+            state.file_paths.add(file_path)
+
+        # 在 _lock 外写入文件，fsync 期间不阻塞读请求
+        content_hash = _content_hash(content)
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            mtime = _write_file_atomic(file_path, content)
         except OSError as e:
-            logger.error(f"Failed to create article file: {e}")
+            logger.error("Failed to create article file: %s", e)
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            with _lock:
+                state.file_paths.discard(file_path)
             raise IOError("无法保存文章文件") from e
 
-        article = Article(
-            id=_next_id,
-            title=title,
-            content=content,
-            created_at=now,
-            updated_at=now,
-            file_path=file_path,
-            last_accessed=now,
-            category=category
-        )
-        _db.append(article)
-        logger.info(f"Created new article: {title} (ID: {_next_id}, Category: '{category or '无'}')")
-        _next_id += 1
-        return article
+        with _lock:
+            article_id = state.next_id
+            state.next_id += 1
+            article = Article(
+                id=article_id,
+                title=title,
+                content=content,
+                created_at=now,
+                updated_at=now,
+                file_path=file_path,
+                category=category,
+                content_hash=content_hash,
+                file_mtime=mtime
+            )
+            state.by_id[article_id] = article
+            state.invalidate_snapshots()
+            state.cache_put(article)
+            logger.info("Created new article: %s (ID: %d, Category: '%s')", title, article_id, category or '无')
+            return replace(article)
 
 
 def update_article_db(article_id: int, title: str, content: str) -> Optional[Article]:
-    """更新文章标题与内容"""
-    with _lock:
-        for article in _db:
-            if article.id == article_id:
-                article.title = title
-                article.content = content
-                article.updated_at = datetime.now()
-                article.last_accessed = datetime.now()
-
-                # 更新对应文件
-                if article.file_path:
-                    try:
-                        with open(article.file_path, 'w', encoding='utf-8') as f:
-                            f.write(content)
-                    except OSError as e:
-                        logger.error(f"Failed to update article file: {e}")
-                        raise IOError("无法更新文章文件") from e
-
-                logger.info(f"Updated article {article_id}: {title}")
-                return article
-    return None
+    """更新文章标题与内容（内容未变化时跳过文件写入；返回快照，见 get_article）"""
+    state = _state
+    new_hash = _content_hash(content)
+    with _write_lock:
+        with _lock:
+            article = state.by_id.get(article_id)
+            if article is None:
+                return None
+            file_path = article.file_path
+            file_mtime = article.file_mtime
+            known_hash = article.content_hash
+
+        # 先在 _lock 外写文件（fsync 期间不阻塞读请求），成功后再修改内存中的文章，
+        # 避免写入失败时残留未保存的内容；摘要相同且文件未被外部修改时无需重写
+        if file_path:
+            unchanged = (
+                new_hash == known_hash
+                and file_mtime is not None
+                and _file_mtime(file_path) == file_mtime
+            )
+            if not unchanged:
+                try:
+                    file_mtime = _write_file_atomic(file_path, content)
+                except OSError as e:
+                    logger.error("Failed to update article file: %s", e)
+                    raise IOError("无法更新文章文件") from e
+
+        with _lock:
+            state.version += 1
+            article.title = title
+            article.content = content
+            article.updated_at = datetime.now()
+            if file_path:
+                article.content_hash = new_hash
+                article.file_mtime = file_mtime
+                state.cache_put(article)
+
+            logger.info("Updated article %d: %s", article_id, title)
+            return replace(article)
 
 
 def delete_article_db(article_id: int) -> None:
     """删除文章及其对应文件"""
-    with _lock:
-        for article in _db[:]:  # 拷贝一份以便安全删除
-            if article.id == article_id:
-                if article.file_path and os.path.exists(article.file_path):
-                    try:
-                        os.remove(article.file_path)
-                        logger.info(f"Deleted article file: {article.file_path}")
-                    except OSError as e:
-                        logger.error(f"Failed to delete article file: {e}")
-                _db.remove(article)
-                logger.info(f"Deleted article {article_id}")
+    state = _state
+    with _write_lock:
+        with _lock:
+            state.cache_drop(article_id)
+            article = state.by_id.pop(article_id, None)
+            if article is None:
+                logger.warning("Article %d not found for deletion", article_id)
                 return
-    logger.warning(f"Article {article_id} not found for deletion")
-
+            state.invalidate_snapshots()
 
-def cleanup_cache() -> None:
-    """清理过期的文章内容缓存（仅针对已加载的存档文章）"""
-    now = datetime.now()
+        if article.file_path:
+            # 直接删除并忽略文件不存在的情况，省去一次 exists 检查
+            try:
+                os.remove(article.file_path)
+                logger.info("Deleted article file: %s", article.file_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error("Failed to delete article file: %s", e)
+        with _lock:
+            state.file_paths.discard(article.file_path)
+        logger.info("Deleted article %d", article_id)
+
+
+def cleanup_cache() -> Optional[float]:
+    """
+    清理过期的文章内容缓存（缓存按访问顺序排列，只需从最久未访问的一端检查）。
+    返回距离下一条缓存过期的秒数；缓存为空时返回 None。
+    """
+    state = _state
+    ttl = CACHE_EXPIRY.total_seconds()
+    now = time.monotonic()
+    deadline = now - ttl
     with _lock:
+        cache = state.content_cache
         cleaned = 0
-        for article in _db:
-            if article.file_path and article.content:
-                if now - article.last_accessed > CACHE_EXPIRY:
-                    article.content = ""
-                    cleaned += 1
+        next_expiry = None
+        while cache:
+            article_id, (_, accessed) = next(iter(cache.items()))
+            if accessed > deadline:
+                next_expiry = accessed + ttl - now
+                break
+            state.cache_drop(article_id)
+            cleaned += 1
         if cleaned:
-            logger.info(f"Cleaned {cleaned} article caches")
\ No newline at end of file
+            logger.info("Cleaned %d article caches", cleaned)
+        return next_expiry
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 import os.path
 import secrets
@@ -9,22 +10,25 @@ from datetime import timedelta
 import sys
 from pathlib import Path
 from configparser import ConfigParser
+from typing import Optional
 
 from fastapi import FastAPI, Request, HTTPException, Form, Depends, status
-from fastapi.responses import RedirectResponse
-from fastapi.security import APIKeyCookie
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from starlette.middleware.sessions import SessionMiddleware
 
 from .database import (
+    CACHE_EXPIRY,
     init_archive,
     cleanup_cache,
     get_articles,
     get_categories,
+    get_db_version,
     create_new_article,
     get_article,
+    get_article_meta,
     delete_article_db,
     update_article_db,
 )
@@ -113,16 +117,37 @@ ADMIN_KEY = load_admin_key()
 logger.info(f"当前管理员密钥已加载")
 
 # ---------- 密钥验证依赖 ----------
-admin_key_scheme = APIKeyCookie(name=ADMIN_KEY_NAME, auto_error=False)
+def check_admin_key(key: Optional[str]) -> bool:
+    """常量时间比较管理员密钥，避免计时侧信道"""
+    if not key:
+        return False
+    return secrets.compare_digest(key.encode("utf-8"), ADMIN_KEY.encode("utf-8"))
 
 
-def validate_admin_key(admin_key: str = Depends(admin_key_scheme)):
-    if admin_key != ADMIN_KEY:
+class AdminStateMiddleware:
+    """每个请求只解析一次管理员 Cookie，结果存入 request.state.is_admin"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            cookie = Request(scope).cookies.get(ADMIN_KEY_NAME)
+            scope.setdefault("state", {})["is_admin"] = check_admin_key(cookie)
+        await self.app(scope, receive, send)
+
+
+def is_admin(request: Request) -> bool:
+    """判断当前请求是否携带有效的管理员 Cookie"""
+    return request.state.is_admin
+
+
+def validate_admin_key(request: Request):
+    if not request.state.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="无效的管理员密钥",
         )
-    return admin_key
 
 
 # ---------- 异步数据库包装（避免阻塞事件循环） ----------
@@ -138,6 +163,10 @@ async def fetch_article(article_id: int):
     return await asyncio.to_thread(get_article, article_id)
 
 
+async def fetch_article_meta(article_id: int):
+    return await asyncio.to_thread(get_article_meta, article_id)
+
+
 async def create_article(title: str, content: str):
     return await asyncio.to_thread(create_new_article, title, content)
 
@@ -165,6 +194,7 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(SessionMiddleware, secret_key=secrets.token_urlsafe(32))
+app.add_middleware(AdminStateMiddleware)
 
 # 静态文件与模板
 base_dir = Path(__file__).parent.parent
@@ -174,6 +204,8 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 if pages_dir.exists():
     app.mount("/pages", StaticFiles(directory=pages_dir, html=True), name="pages")
 templates = Jinja2Templates(directory="frontend/templates")
+# 模板在运行期间不会变化，关闭自动重载可省去每次渲染前对模板文件的 stat 检查
+templates.env.auto_reload = False
 
 # 将站点信息注入所有模板的全局上下文
 templates.env.globals["site_title"] = SITE_TITLE
@@ -185,16 +217,97 @@ templates.env.globals["giscus"] = GISCUS_CONFIG if GISCUS_CONFIG["enabled"] else
 def render_template(name: str, request: Request, **kwargs):
     return templates.TemplateResponse(name, {
         "request": request,
-        "is_admin": request.cookies.get(ADMIN_KEY_NAME) == ADMIN_KEY,
+        "is_admin": is_admin(request),
         **kwargs,
     })
 
 
+# ---------- ETag 协商缓存 ----------
+# 每个进程使用不同的盐，重启（模板或数据版本号重置）后旧的 ETag 自动失效
+_ETAG_SALT = secrets.token_hex(8)
+# 页面随管理员 Cookie 变化：禁止共享缓存保存，并按 Cookie 区分缓存项
+_REVALIDATE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "Cookie"}
+
+
+def make_etag(*parts) -> str:
+    """由影响页面内容的字段生成弱 ETag"""
+    raw = "|".join(map(str, (_ETAG_SALT, *parts)))
+    return f'W/"{hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """判断客户端的 If-None-Match 是否命中当前 ETag（弱比较）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """返回不带响应体的 304 响应"""
+    return Response(status_code=304, headers={"ETag": etag, **_REVALIDATE_HEADERS})
+
+
+def render_article(request: Request, article):
+    """渲染文章页，内容未变化时返回 304（ETag 取自实际渲染的内容，内容为空时不发送 ETag）"""
+    if not article.content:
+        return render_template("article.html", request, article=article)
+    admin = is_admin(request)
+    # 优先复用加载/写入文件时已算好的摘要，避免在事件循环中对全文重复计算
+    content_hash = article.content_hash
+    if content_hash is None:
+        content_hash = hashlib.blake2b(article.content.encode("utf-8"), digest_size=16).digest()
+    etag = make_etag("article", article.id, article.updated_at.timestamp(), content_hash.hex(), admin)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response = render_template("article.html", request, article=article)
+    response.headers["ETag"] = etag
+    response.headers.update(_REVALIDATE_HEADERS)
+    return response
+
+
+# ---------- 首页渲染缓存 ----------
+# 键为 (is_admin, 数据版本号, 自定义页面签名)，值为渲染好的 HTML；文章增删改后版本号变化，旧条目自然失效
+_list_cache: dict = {}
+LIST_CACHE_SIZE = 4
+
+# 自定义页面缓存：(pages 目录中 HTML 文件的 (文件名, mtime) 签名, 页面列表)
+_pages_cache: tuple = (None, [])
+
+
+def get_pages() -> tuple:
+    """
+    返回 (签名, 自定义页面列表)。只 stat pages 目录下的 HTML 文件，
+    签名未变化时复用上次结果，避免每个请求都打开并解析全部页面。
+    """
+    global _pages_cache
+    try:
+        with os.scandir(pages_dir) as it:
+            signature = tuple(sorted(
+                (entry.name, entry.stat().st_mtime_ns)
+                for entry in it
+                if entry.name.endswith(".html") and entry.is_file()
+            ))
+    except FileNotFoundError:
+        signature = ()
+    cached_signature, pages = _pages_cache
+    if signature != cached_signature:
+        pages = _load_pages()
+        _pages_cache = (signature, pages)
+    return signature, pages
+
+
 # ---------- 后台缓存清理 ----------
 async def periodic_cleanup():
+    # 按最早一条缓存的过期时间休眠，空闲时不做无用扫描；
+    # 缓存为空时休眠一个完整有效期，期间新增的缓存最早也要在此之后才过期
+    delay = CACHE_EXPIRY.total_seconds()
     while True:
-        await asyncio.sleep(1800)
-        await asyncio.to_thread(cleanup_cache)
+        await asyncio.sleep(max(delay, 1.0))
+        next_expiry = await asyncio.to_thread(cleanup_cache)
+        delay = CACHE_EXPIRY.total_seconds() if next_expiry is None else next_expiry
 
 
 # ---------- 解析表单 / JSON 数据的通用依赖 ----------
@@ -217,11 +330,45 @@ async def get_article_form_data(request: Request):
 # ---------- 路由 ----------
 @app.get("/")
 @app.get("/articles")
-async def list_articles(request: Request):
+async def list_articles(request: Request, admin: bool = Depends(is_admin)):
+    pages_signature, pages = await asyncio.to_thread(get_pages)
+    # 先读取版本号再取数据，保证缓存内容不会比键所代表的版本更旧
+    key = (admin, get_db_version(), pages_signature)
+    etag = make_etag("index", *key)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    html = _list_cache.get(key)
+    if html is None:
+        articles = await fetch_articles()
+        categories = await fetch_categories()
+        html = templates.get_template("index.html").render(
+            is_admin=admin, articles=articles, categories=categories, pages=pages
+        )
+        _list_cache[key] = html
+        while len(_list_cache) > LIST_CACHE_SIZE:
+            _list_cache.pop(next(iter(_list_cache)))
+    return HTMLResponse(html, headers={"ETag": etag, **_REVALIDATE_HEADERS})
+
+
+@app.get("/articles.json")
+async def list_articles_json(request: Request):
+    """以 JSON 返回文章元数据列表（不含正文），数据未变化时返回 304"""
+    etag = make_etag("json", get_db_version())
+    if etag_matches(request, etag):
+        return not_modified(etag)
     articles = await fetch_articles()
-    categories = await fetch_categories()
-    pages = _load_pages()
-    return render_template("index.html", request, articles=articles, categories=categories, pages=pages)
+    payload = [
+        {
+            "id": article.id,
+            "title": article.title,
+            "category": article.category,
+            "url": article.category_url,
+            "created_at": article.created_at.isoformat(),
+            "updated_at": article.updated_at.isoformat(),
+        }
+        for article in articles
+    ]
+    return JSONResponse(payload, headers={"ETag": etag, **_REVALIDATE_HEADERS})
 
 
 @app.get("/articles/new")
@@ -234,7 +381,7 @@ async def read_article(article_id: int, request: Request):
     article = await fetch_article(article_id)
     if not article:
         raise HTTPException(status_code=404)
-    return render_template("article.html", request, article=article)
+    return render_article(request, article)
 
 
 @app.get("/cate/{catename}/{article_id}")
@@ -242,7 +389,20 @@ async def read_article_by_category(catename: str, article_id: int, request: Requ
     article = await fetch_article(article_id)
     if not article or article.category != catename:
         raise HTTPException(status_code=404)
-    return render_template("article.html", request, article=article)
+    return render_article(request, article)
+
+
+@app.get("/articles/{article_id}/raw")
+async def read_article_raw(article_id: int):
+    """直接返回 Markdown 源文件，由 FileResponse 以 sendfile 发送，无需读入内存"""
+    article = await fetch_article_meta(article_id)
+    if not article or not article.file_path:
+        raise HTTPException(status_code=404)
+    try:
+        stat_result = await asyncio.to_thread(os.stat, article.file_path)
+    except OSError:
+        raise HTTPException(status_code=404)
+    return FileResponse(article.file_path, media_type="text/markdown; charset=utf-8", stat_result=stat_result)
 
 
 @app.get("/articles/{article_id}/edit")
@@ -298,7 +458,7 @@ async def get_admin_key_page(request: Request):
 
 @app.post("/admin/login")
 async def login_admin(request: Request, key: str = Form(...)):
-    if key == ADMIN_KEY:
+    if check_admin_key(key):
         response = RedirectResponse(url="/", status_code=303)
         response.set_cookie(
             key=ADMIN_KEY_NAME,
@@ -1,30 +1,23 @@
 # backend/models.py
 
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 
+@dataclass(slots=True, eq=False)
 class Article:
-    """文章模型"""
+    """文章模型（slots 减少实例内存与属性访问开销；eq=False 保持按对象身份比较）"""
 
-    def __init__(
-        self,
-        id: int,
-        title: str,
-        content: str,
-        created_at: datetime,
-        updated_at: datetime,
-        file_path: str = None,
-        last_accessed: datetime = None,
-        category: str = ""
-    ):
-        self.id = id
-        self.title = title
-        self.content = content
-        self.created_at = created_at
-        self.updated_at = updated_at
-        self.file_path = file_path
-        self.last_accessed = last_accessed or datetime.now()
-        self.category = category
+    id: int
+    title: str
+    content: str
+    created_at: datetime
+    updated_at: datetime
+    file_path: str = None
+    category: str = ""
+    content_hash: Optional[bytes] = None  # 最近一次读取/写入文件时的内容摘要
+    file_mtime: Optional[int] = None  # 与 content_hash 对应的文件修改时间（纳秒）
 
     @property
     def category_url(self) -> str:
@@ -34,4 +27,4 @@ class Article:
         return f"/articles/{self.id}"
 
     def __repr__(self):
-        return f"<Article id={self.id} title='{self.title}'>"
\ No newline at end of file
+        return f"<Article id={self.id} title='{self.title}'>"